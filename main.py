@@ -1,21 +1,19 @@
-import os, json, re
-from datetime import datetime, timezone
+import os, json, re, asyncio, math, time, heapq, signal
+from functools import lru_cache
+from typing import NamedTuple
+from fractions import Fraction
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from threading import Thread
-from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
 
-from flask import Flask
+from aiohttp import web
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from discord.ext.commands import cooldown, BucketType
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
-# ---- TEMP: use an alternate Discord API base to dodge Cloudflare block
-import os, discord.http
-discord.http.Route.BASE = os.getenv("DISCORD_API_BASE", "https://canary.discord.com/api/v10")
-
 # ---------- Env & constants ----------
 def _require_env(key: str) -> str:
     val = os.getenv(key)
@@ -34,18 +32,18 @@ MAIN_GUILD_ID = None  # set at runtime
 # --- uptime tracking ---
 START_TIME_UTC = datetime.now(timezone.utc)
 
-# ---------- Flask keep-alive ----------
-app = Flask(__name__)
-@app.route("/")
-def home():
-    return "✅ Bot is alive!"
+# ---------- Keep-alive web server ----------
+async def home(request: web.Request) -> web.Response:
+    return web.Response(text="✅ Bot is alive!")
 
-def run():
+async def keep_alive():
+    # served from the bot's own event loop, no extra thread
+    app = web.Application()
+    app.router.add_get("/", home)
+    runner = web.AppRunner(app)
+    await runner.setup()
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port)
-
-def keep_alive():
-    Thread(target=run, daemon=True).start()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
 
 # ---------- Google Sheets helpers ----------
 _HEADERS = ["guild_id", "user_id", "name", "pick", "ts_utc"]
@@ -53,6 +51,7 @@ _HEADERS = ["guild_id", "user_id", "name", "pick", "ts_utc"]
 # cache the client and the "Picks" worksheet to cut latency & quota
 _gs_client = None
 _ws_cache = None
+_header_rewritten = False  # True if _sheet() found a wrong/missing header row and rewrote it
 
 def _gs_authorize():
     global _gs_client
@@ -70,7 +69,7 @@ def _gs_authorize():
     return _gs_client
 
 def _sheet():
-    global _ws_cache
+    global _ws_cache, _header_rewritten
     if _ws_cache:
         return _ws_cache
     client = _gs_authorize()
@@ -83,38 +82,83 @@ def _sheet():
     existing = ws.row_values(1)
     if existing != _HEADERS:
         ws.update("A1", [_HEADERS])
+        _header_rewritten = True
     _ws_cache = ws
     return ws
 
 # open a worksheet from any spreadsheet, used by !totals
+_open_ws_cache: dict[tuple[str, str], gspread.Worksheet] = {}
+
 def _open_ws(sheet_id: str, tab_title: str):
-    client = _gs_authorize()
-    return client.open_by_key(sheet_id).worksheet(tab_title)
+    key = (sheet_id, tab_title)
+    ws = _open_ws_cache.get(key)
+    if ws is None:
+        client = _gs_authorize()
+        ws = client.open_by_key(sheet_id).worksheet(tab_title)
+        _open_ws_cache[key] = ws
+    return ws
+
+# the bot never writes the totals tab, so a short TTL is all the invalidation it needs
+TOTALS_CACHE_TTL = 15  # seconds
+_totals_cache: dict[tuple[str, str], tuple[float, list]] = {}
+
+def _read_totals(sheet_id: str, tab_title: str):
+    key = (sheet_id, tab_title)
+    hit = _totals_cache.get(key)
+    if hit and time.monotonic() - hit[0] < TOTALS_CACHE_TTL:
+        return hit[1]
+    # one range read for O2:O8, rows come back indexed from O2
+    rng = _open_ws(sheet_id, tab_title).get("O2:O8")
+    _totals_cache[key] = (time.monotonic(), rng)
+    return rng
 
 # ---------- Guild & time helpers ----------
+async def _reveal_channel(bot: commands.Bot):
+    return bot.get_channel(REVEAL_CHANNEL_ID) or await bot.fetch_channel(REVEAL_CHANNEL_ID)
+
 async def _get_main_guild(bot: commands.Bot):
     global MAIN_GUILD_ID
     if MAIN_GUILD_ID:
         g = bot.get_guild(MAIN_GUILD_ID)
         if g:
             return g
-    ch = bot.get_channel(REVEAL_CHANNEL_ID) or await bot.fetch_channel(REVEAL_CHANNEL_ID)
+    ch = await _reveal_channel(bot)
     MAIN_GUILD_ID = ch.guild.id
     return ch.guild
 
+# hour without a leading zero: glibc/BSD use %-I, Windows uses %#I
+_HOUR_FMT = "%#I" if os.name == "nt" else "%-I"
+_TIME_FMT = f"%a {_HOUR_FMT}:%M %p"
+_DATE_TIME_FMT = f"%a %b %d, {_HOUR_FMT}:%M %p"
+
 def _fmt_time_12h(dt_utc: datetime) -> str:
-    local = dt_utc.astimezone(EASTERN)
-    return f"{local.strftime('%a %I:%M %p').lstrip('0')}"
+    return dt_utc.astimezone(EASTERN).strftime(_TIME_FMT)
 
-def _parse_iso(ts: str) -> datetime:
-    # tolerant ISO parser without adding new deps
+def _parse_iso_strict(ts: str) -> datetime:
     if ts.endswith("Z"):
         ts = ts[:-1] + "+00:00"
+    return datetime.fromisoformat(ts)
+
+def _parse_iso(ts: str) -> datetime:
+    # tolerant ISO parser without adding new deps
     try:
-        return datetime.fromisoformat(ts)
+        return _parse_iso_strict(ts)
     except Exception:
         return datetime.now(timezone.utc)
 
+# stored timestamps never change, so their display string can be memoized;
+# a bad cell raises here, and lru_cache doesn't keep exceptions
+@lru_cache(maxsize=4096)
+def _fmt_iso_12h(ts_iso: str) -> str:
+    return _fmt_time_12h(_parse_iso_strict(ts_iso))
+
+def _fmt_ts_12h(ts_iso: str) -> str:
+    try:
+        return _fmt_iso_12h(ts_iso)
+    except Exception:
+        # hand-edited cell: fall back to "now" every time instead of caching it
+        return _fmt_time_12h(_parse_iso(ts_iso))
+
 def _fmt_duration(seconds: int) -> str:
     mins, secs = divmod(int(seconds), 60)
     hrs, mins = divmod(mins, 60)
@@ -126,6 +170,19 @@ def _fmt_duration(seconds: int) -> str:
     parts.append(f"{secs}s")
     return " ".join(parts)
 
+def _chunk_lines(lines: list[str], limit: int = 2000):
+    """Join lines into messages that each fit Discord's length limit."""
+    buf, size = [], 0
+    for line in lines:
+        # +1 for the newline that joins it to the buffer
+        if buf and size + 1 + len(line) > limit:
+            yield "\n".join(buf)
+            buf, size = [], 0
+        size += len(line) + (1 if buf else 0)
+        buf.append(line)
+    if buf:
+        yield "\n".join(buf)
+
 async def _announce_channel(bot: commands.Bot):
     g = await _get_main_guild(bot)
     gen = discord.utils.get(g.text_channels, name="general")
@@ -135,56 +192,203 @@ async def _announce_channel(bot: commands.Bot):
         return g.system_channel
     return bot.get_channel(REVEAL_CHANNEL_ID)
 
+# send permission per channel id; cleared by the role/channel/member events
+# below, with a TTL as a safety net for anything those miss
+SEND_PERM_TTL = 300  # seconds
+_send_perm_cache: dict[int, tuple[float, bool]] = {}
+
+def _can_send(ch) -> bool:
+    hit = _send_perm_cache.get(ch.id)
+    if hit and time.monotonic() - hit[0] < SEND_PERM_TTL:
+        return hit[1]
+    ok = ch.permissions_for(ch.guild.me).send_messages
+    _send_perm_cache[ch.id] = (time.monotonic(), ok)
+    return ok
+
 def _ctx_guild(ctx) -> discord.Guild | None:
     return getattr(ctx.channel, "guild", None)
 
 # ---------- data access ----------
+# latest picks per guild, kept in step with the sheet so reads skip the API;
+# writes go through the cache, the TTL only exists to pick up hand edits
+PICKS_CACHE_TTL = 60  # seconds
+_picks_cache: dict[str, dict[str, dict]] = {}
+_picks_loaded_at: dict[str, float] = {}
+
+# rows waiting to be appended to the sheet; they stay here until the append succeeds
+PICK_FLUSH_BATCH = 20  # flush early once this many rows are queued
+_pending_rows: list[list[str]] = []
+_flush_lock = asyncio.Lock()
+
 def save_pick_to_sheet(guild_id: int, user_id: int, name: str, pick: str, ts_utc_iso: str):
+    """Queue the row for the next batched append; the cache sees it immediately."""
+    _pending_rows.append([str(guild_id), str(user_id), name, pick, ts_utc_iso])
+    _picks_cache.setdefault(str(guild_id), {})[str(user_id)] = {"name": name, "pick": pick, "ts_utc": ts_utc_iso}
+
+async def _flush_pending_locked():
+    # caller holds _flush_lock
+    rows = _pending_rows[:]
+    if not rows:
+        return
     try:
-        ws = _sheet()
-        ws.append_row([str(guild_id), str(user_id), name, pick, ts_utc_iso], value_input_option="RAW")
+        await asyncio.to_thread(lambda: _sheet().append_rows(rows, value_input_option="RAW"))
     except gspread.exceptions.APIError as e:
         raise RuntimeError("Google Sheets quota or permission error") from e
+    del _pending_rows[:len(rows)]
 
-def load_latest_picks(guild_id: int):
-    """Return dict keyed by user_id with latest pick only."""
-    ws = _sheet()
-    records = ws.get_all_records()  # list of dicts, skips header
+async def flush_pending_picks():
+    """Append every queued row in a single Sheets call."""
+    async with _flush_lock:
+        await _flush_pending_locked()
+
+async def _flush_pending_logged():
+    # rows stay queued on failure, the next tick retries them
+    try:
+        await flush_pending_picks()
+    except Exception as e:
+        print("Pick flush failed:", type(e).__name__, e)
+
+_early_flush_task: asyncio.Task | None = None  # size-triggered flush from !pick
+
+@tasks.loop(seconds=2)
+async def flush_picks_task():
+    await _flush_pending_logged()
+
+def _picks_fresh(gid: str) -> bool:
+    loaded_at = _picks_loaded_at.get(gid)
+    return loaded_at is not None and time.monotonic() - loaded_at < PICKS_CACHE_TTL
+
+async def _load_latest_picks_locked(guild_id: int):
+    # caller holds _flush_lock, so no row can move from the queue to the
+    # sheet between the sheet read and the queue read below
+    gid = str(guild_id)
+    if _picks_fresh(gid):
+        return _picks_cache.get(gid, {})
+    # plain 2D read of the data rows; cells come back as strings, unlike
+    # get_all_records which builds a dict per row and numericises ids
+    rows = await asyncio.to_thread(lambda: _sheet().get("A2:E"))
+    # include rows that haven't been flushed yet
+    rows = rows + _pending_rows
     latest = {}
-    for r in records:
-        if str(r.get("guild_id")) != str(guild_id):
+    for row in rows:
+        if not row or row[0] != gid:
             continue
-        uid = str(r.get("user_id"))
-        ts = r.get("ts_utc") or ""
+        # trailing empty cells are omitted by the API
+        _, uid, name, pick, ts = (row + [""] * 5)[:5]
         if uid not in latest or ts > latest[uid]["ts_utc"]:
-            latest[uid] = {"name": r.get("name", ""), "pick": r.get("pick", ""), "ts_utc": ts}
+            latest[uid] = {"name": name, "pick": pick, "ts_utc": ts}
+    _picks_cache[gid] = latest
+    _picks_loaded_at[gid] = time.monotonic()
     return latest
 
+async def load_latest_picks(guild_id: int):
+    """Return dict keyed by user_id with latest pick only."""
+    if _picks_fresh(str(guild_id)):
+        return _picks_cache.get(str(guild_id), {})
+    async with _flush_lock:
+        return await _load_latest_picks_locked(guild_id)
+
+def _row_runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Collapse ascending row numbers into inclusive (start, end) runs."""
+    runs = []
+    for r in rows:
+        if runs and runs[-1][1] == r - 1:
+            runs[-1] = (runs[-1][0], r)
+        else:
+            runs.append((r, r))
+    return runs
+
 def clear_guild_picks(guild_id: int):
+    gid = str(guild_id)
     ws = _sheet()
-    values = ws.get_all_values()
-    if not values:
-        ws.update("A1", [_HEADERS])
-        return
-    header, rows = values[0], values[1:]
-    keep = [row for row in rows if row and row[0] != str(guild_id)]
-    ws.clear()
-    ws.update("A1", [header] + keep if keep else [header])
+    # only column A is needed to find this guild's rows (row 1 is the header)
+    col = ws.col_values(1)
+    rows = [i for i, v in enumerate(col, start=1) if i > 1 and v == gid]
+    if rows:
+        # one batchUpdate for every run; requests apply in order, so go
+        # bottom-up to keep the row numbers of earlier runs valid
+        requests = [
+            {"deleteDimension": {"range": {
+                "sheetId": ws.id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end,
+            }}}
+            for start, end in reversed(_row_runs(rows))
+        ]
+        ws.spreadsheet.batch_update({"requests": requests})
+
+def _reset_picks_cache(guild_id: int, revealed: int):
+    # run on the event loop after clear_guild_picks, so no !pick can slip in.
+    # The first `revealed` queued rows were in the reveal snapshot (queued
+    # while the flush was in flight): drop this guild's ones, they were just
+    # shown. Rows queued after the snapshot carry over to next week.
+    gid = str(guild_id)
+    _pending_rows[:revealed] = [row for row in _pending_rows[:revealed] if row[0] != gid]
+    _picks_cache[gid] = {
+        uid: {"name": name, "pick": pick, "ts_utc": ts}
+        for g, uid, name, pick, ts in _pending_rows if g == gid
+    }
+    _picks_loaded_at[gid] = time.monotonic()
 
 # ---------- Discord ----------
+_shutdown_task: asyncio.Task | None = None
+
+def _on_sigterm():
+    global _shutdown_task
+    if _shutdown_task is None:
+        _shutdown_task = asyncio.create_task(bot.close())
+
+class PicksBot(commands.Bot):
+    async def setup_hook(self):
+        await keep_alive()
+        # the flush loop doesn't need the guild, so don't tie it to on_ready
+        flush_picks_task.start()
+        # Render stops the service with SIGTERM; close cleanly so queued picks get flushed
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, _on_sigterm)
+        except NotImplementedError:  # Windows event loops
+            pass
+        # register slash commands once per process, not on every reconnect
+        await self.tree.sync()
+
+    async def close(self):
+        # !pick confirms before the row reaches Sheets, so drain the queue first
+        await _flush_pending_logged()
+        if _pending_rows:
+            print(f"Shutting down with {len(_pending_rows)} unsaved pick(s):", _pending_rows)
+        await super().close()
+
+# commands are hybrid (slash + prefix), so the privileged message_content
+# intent is off; "!" still works in DMs and when the bot is mentioned
 intents = discord.Intents.default()
-intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+# no member chunking or message cache: commands only ever need ctx.author
+bot = PicksBot(
+    command_prefix=commands.when_mentioned_or("!"),
+    intents=intents,
+    help_command=None,
+    chunk_guilds_at_startup=False,
+    max_messages=None,
+    member_cache_flags=discord.MemberCacheFlags.none(),
+)
 
 # --- helper that posts and clears, used by scheduler and !revealnow
 async def _do_auto_reveal():
-    channel = bot.get_channel(REVEAL_CHANNEL_ID) or await bot.fetch_channel(REVEAL_CHANNEL_ID)
+    # hold the flush lock from the flush through the clear, so a pick can't
+    # reach the sheet mid-reveal and then be deleted without being shown
+    async with _flush_lock:
+        return await _reveal_and_clear()
+
+async def _reveal_and_clear():
+    # queued picks must reach the sheet before it is cleared; the flush
+    # doesn't depend on the channel, so overlap it with the lookup
+    channel, _ = await asyncio.gather(_reveal_channel(bot), _flush_pending_locked())
     guild = getattr(channel, "guild", None)
     if not guild:
         return False
     guild_id = guild.id
 
-    latest = load_latest_picks(guild_id)
+    latest = await _load_latest_picks_locked(guild_id)
+    # queued rows up to here are part of `latest`; we hold _flush_lock, so
+    # this prefix of the queue can't be flushed away before the clear
+    revealed = len(_pending_rows)
     if not latest:
         try:
             await channel.send("⚠️ No picks were submitted.")
@@ -192,91 +396,125 @@ async def _do_auto_reveal():
             pass
         return False
 
-    lines = ["**📣 This Week’s Picks:**"]
-    for rec in latest.values():
-        ts = _parse_iso(rec["ts_utc"])
-        lines.append(f"- **{rec['name']}**: {rec['pick']} *(submitted {_fmt_time_12h(ts)} ET)*")
+    lines = ["**📣 This Week’s Picks:**"] + [
+        f"- **{rec['name']}**: {rec['pick']} *(submitted {_fmt_ts_12h(rec['ts_utc'])} ET)*"
+        for rec in latest.values()
+    ]
 
+    # sent in order, one chunk at a time, so the list reads top to bottom
     try:
-        await channel.send("\n".join(lines))
+        for chunk in _chunk_lines(lines):
+            await channel.send(chunk)
     except discord.Forbidden:
         return False
 
-    clear_guild_picks(guild_id)
+    await asyncio.to_thread(clear_guild_picks, guild_id)
+    _reset_picks_cache(guild_id, revealed)
     return True
 
 @bot.event
 async def on_ready():
-    g = await _get_main_guild(bot)
+    # resolve the guild and run the Sheets header self-test side by side
+    g, sheets = await asyncio.gather(
+        _get_main_guild(bot),
+        asyncio.to_thread(_sheet),  # first call verifies the header row
+        return_exceptions=True,
+    )
+    if isinstance(g, BaseException):
+        raise g
     print(f"✅ Logged in as {bot.user} | Main guild: {g.name} ({g.id})")
-    # quick self-test of Sheets header, non-fatal
-    try:
-        _ = _sheet().row_values(1)
-    except Exception as e:
-        print("Sheets self-test failed:", type(e).__name__, e)
-    if not auto_reveal_task.is_running():
-        auto_reveal_task.start()
+    # self-test failure is non-fatal
+    if isinstance(sheets, Exception):
+        print("Sheets self-test failed:", type(sheets).__name__, sheets)
+    global _reveal_task
+    if _reveal_task is None or _reveal_task.done():
+        _reveal_task = asyncio.create_task(_reveal_scheduler())
+
+@bot.event
+async def on_guild_role_update(before, after):
+    _send_perm_cache.clear()
+
+@bot.event
+async def on_guild_role_delete(role):
+    _send_perm_cache.clear()
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    _send_perm_cache.pop(after.id, None)
+
+@bot.event
+async def on_member_update(before, after):
+    if after.id == bot.user.id:
+        _send_perm_cache.clear()
 
 @bot.event
 async def on_command_error(ctx, error):
     from discord.ext.commands import CommandOnCooldown
+    # the bot's @mention is a prefix, so ordinary "@bot thanks" chatter lands here
+    if isinstance(error, commands.CommandNotFound):
+        return
     if isinstance(error, CommandOnCooldown):
         await ctx.send(f"⏳ Slow down: try again in {error.retry_after:.1f}s.")
         return
     await ctx.send(f"⚠️ Error: {type(error).__name__}")
 
-@bot.command()
+@bot.hybrid_command(description="Check the bot is responding")
 async def ping(ctx):
     await ctx.send("pong 🏌️")
 
-@bot.command()
+@bot.hybrid_command(description="Submit or change your pick for this week")
+@app_commands.describe(golfer="Golfer you're picking")
 @cooldown(1, 10, BucketType.user)  # prevent spam and double-submits
 async def pick(ctx, *, golfer: str):
-    # Allow in DMs and in servers, always persist to the main guild
+    # Allow in DMs and in servers, always persist to the main guild.
+    # Replies are ephemeral so /pick in a server channel doesn't reveal the pick.
     golfer = " ".join(golfer.split())
     if not (1 <= len(golfer) <= 64):
-        await ctx.send("❌ Golfer name must be 1–64 characters.")
+        await ctx.send("❌ Golfer name must be 1–64 characters.", ephemeral=True)
         return
 
+    await ctx.defer(ephemeral=True)
     g = await _get_main_guild(bot)
     now_utc = datetime.now(timezone.utc)
-    try:
-        save_pick_to_sheet(g.id, ctx.author.id, ctx.author.display_name, golfer, now_utc.isoformat())
-    except Exception as e:
-        await ctx.send(f"❌ Could not save pick ({type(e).__name__}). Try again.")
-        return
+    save_pick_to_sheet(g.id, ctx.author.id, ctx.author.display_name, golfer, now_utc.isoformat(timespec="seconds"))
 
-    await ctx.send(f"✅ Pick saved for **{golfer}**")
+    await ctx.send(f"✅ Pick saved for **{golfer}**", ephemeral=True)
+    # a burst can queue rows faster than the timer drains them; flush in the
+    # background so a reveal holding the lock or a slow Sheets call doesn't
+    # hold up this command, and keep at most one early flush in flight
+    global _early_flush_task
+    if len(_pending_rows) >= PICK_FLUSH_BATCH and (_early_flush_task is None or _early_flush_task.done()):
+        _early_flush_task = asyncio.create_task(_flush_pending_logged())
 
     # Optional server announcement
     ch = await _announce_channel(bot)
-    if ch and ch.permissions_for(ch.guild.me).send_messages:
+    if ch and _can_send(ch):
         try:
             await ch.send(f"📝 **{ctx.author.display_name}** just submitted a pick.")
         except discord.Forbidden:
             pass
 
-@bot.command()
+@bot.hybrid_command(description="Show who has submitted a pick and when")
 async def submits(ctx):
+    await ctx.defer()
     g = await _get_main_guild(bot)
-    latest = load_latest_picks(g.id)
+    latest = await load_latest_picks(g.id)
     if not latest:
         await ctx.send("📭 No picks submitted yet.")
         return
-    lines = ["**🕒 Pick Submission Times**"]
-    for rec in latest.values():
-        ts = _parse_iso(rec["ts_utc"])
-        lines.append(f"- **{rec['name']}** at {_fmt_time_12h(ts)} ET")
-    await ctx.send("\n".join(lines))
+    lines = ["**🕒 Pick Submission Times**"] + [
+        f"- **{rec['name']}** at {_fmt_ts_12h(rec['ts_utc'])} ET" for rec in latest.values()
+    ]
+    for chunk in _chunk_lines(lines):
+        await ctx.send(chunk)
 
-@bot.command()
+@bot.hybrid_command(description="Show the current money totals")
 async def totals(ctx):
     sid = os.getenv("TOTALS_SHEET_ID") or os.getenv("SHEET_ID")
     tab = os.getenv("TOTALS_TAB", "Sheet1")
+    await ctx.defer()
     try:
-        ws = _open_ws(sid, tab)
-        # batch cells to reduce round-trips
-        (leader,), (lead_by,), (hiatt,), (caden,), (bennett,) = ws.batch_get(["O2","O3","O6","O7","O8"])
+        rng = await asyncio.to_thread(_read_totals, sid, tab)
     except gspread.SpreadsheetNotFound:
         await ctx.send("❌ Can't open totals spreadsheet.")
         return
@@ -286,6 +524,11 @@ async def totals(ctx):
     except Exception as e:
         await ctx.send(f"❌ Sheets error: {type(e).__name__}")
         return
+    # empty cells come back as [] and trailing empty rows are dropped
+    def cell(i):
+        return rng[i][0] if i < len(rng) and rng[i] else ""
+    leader, lead_by = cell(0), cell(1)
+    hiatt, caden, bennett = cell(4), cell(5), cell(6)
     msg = (
         f"**💰 Current Totals**\n"
         f"Hiatt — {hiatt}\n"
@@ -296,116 +539,148 @@ async def totals(ctx):
         msg += f"\n\n🏆 **{leader}** is up by **{lead_by}**"
     await ctx.send(msg)
 
-@bot.command()
+@bot.hybrid_command(description="Reveal and clear this week's picks now (owner only)")
 async def revealnow(ctx):
     if ctx.author.id != OWNER_ID:
         await ctx.send("❌ Not authorized.")
         return
+    await ctx.defer()
     ok = await _do_auto_reveal()
     await ctx.send("✅ Revealed and cleared." if ok else "⚠️ No picks were submitted.")
 
-# ---------- Scheduler with 'already ran' latch ----------
-_last_reveal_date = None
-
-@tasks.loop(minutes=1)
-async def auto_reveal_task():
-    global _last_reveal_date
-    now = datetime.now(EASTERN)
-    # Wednesday 21:00 ET, fire once per date
-    if now.strftime("%A") == "Wednesday" and now.strftime("%H:%M") == "21:00":
-        if _last_reveal_date == now.date():
-            return
+# ---------- Scheduler: sleep until the next reveal ----------
+_reveal_task: asyncio.Task | None = None
+
+def _next_reveal_after(now: datetime) -> datetime:
+    """Next Wednesday 21:00 ET strictly after `now`."""
+    now = now.astimezone(EASTERN)
+    target = now.replace(hour=21, minute=0, second=0, microsecond=0)
+    target += timedelta(days=(2 - now.weekday()) % 7)
+    if target <= now:
+        target += timedelta(days=7)
+    return target
+
+async def _reveal_scheduler():
+    target = _next_reveal_after(datetime.now(EASTERN))
+    while True:
+        # subtract in UTC so a DST change in between is accounted for
+        delay = (target - datetime.now(timezone.utc)).total_seconds()
+        await asyncio.sleep(max(delay, 0))
         try:
             ok = await _do_auto_reveal()
-            print(f"[auto_reveal] {now.isoformat()} -> {'posted' if ok else 'no picks'}")
+            print(f"[auto_reveal] {target.isoformat()} -> {'posted' if ok else 'no picks'}")
         except Exception as e:
             print("Auto reveal failed:", type(e).__name__, e)
-        finally:
-            _last_reveal_date = now.date()
+        # chain off the target, not the clock, so an early wakeup can't fire twice
+        target = _next_reveal_after(target)
 
 # ---------- Odds allocation command ----------
-def frac_to_decimal(frac_str: str) -> Decimal:
-    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)\s*", frac_str)
+_FRAC_RE = re.compile(r"\s*(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)\s*")
+_HEADER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*u\b\s+\$?\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+# slash command options are single-line, so ';' also separates slate lines
+_SLATE_SPLIT_RE = re.compile(r"[;\n]")
+_PICK_LINE_RE = re.compile(r"(.*\S)\s+(\d+(?:\.\d+)?/\d+(?:\.\d+)?)\s*$")
+
+class Pick(NamedTuple):
+    name: str
+    frac: str  # as typed, e.g. '9/2'
+    odds: Fraction  # decimal odds, e.g. 11/2
+
+def frac_to_odds(frac_str: str) -> Fraction:
+    """Fractional odds like '9/2' as exact decimal odds (5.5)."""
+    m = _FRAC_RE.fullmatch(frac_str)
     if not m:
         raise ValueError(f"Bad fractional odds: {frac_str}")
-    num = Decimal(m.group(1))
-    den = Decimal(m.group(2))
+    num = Fraction(m.group(1))
+    den = Fraction(m.group(2))
     if den == 0:
         raise ValueError("Denominator cannot be zero")
-    return (num / den) + Decimal("1")
+    return num / den + 1
 
 def parse_header(line: str):
-    m = re.search(r"!allocate\s+(\d+(?:\.\d+)?)\s*u\b\s+\$?\s*(\d+(?:\.\d+)?)", line, re.IGNORECASE)
+    m = _HEADER_RE.search(line)
     if not m:
-        raise ValueError("Header must look like: !allocate 1u $10")
-    units = Decimal(m.group(1))
-    unit_value = Decimal(m.group(2))
+        raise ValueError("Stake must look like: 1u $10")
+    units = Fraction(m.group(1))
+    unit_value = Fraction(m.group(2))
     return units, unit_value
 
-def parse_lines(lines):
+def parse_lines(lines) -> tuple[list[Pick], list[Fraction]]:
+    """Parse slate lines into picks plus their odds, in the same order."""
     picks = []
+    odds_list = []
     for ln in lines:
-        if not ln.strip():
+        stripped = ln.strip()
+        if not stripped:
             continue
-        m = re.search(r"(.*\S)\s+(\d+(?:\.\d+)?/\d+(?:\.\d+)?)\s*$", ln.strip())
+        m = _PICK_LINE_RE.search(stripped)
         if not m:
             raise ValueError(f"Could not parse line: {ln}")
         name = m.group(1).strip()
         frac = m.group(2).strip()
-        dec_odds = frac_to_decimal(frac)
-        picks.append((name, frac, dec_odds))
-    return picks
-
-def equal_payout_stakes(total_stake: Decimal, dec_odds_list):
-    inv_sum = sum((Decimal("1") / o for o in dec_odds_list), start=Decimal("0"))
-    W = (total_stake / inv_sum)
-    raw = [W / o for o in dec_odds_list]
-    rounded = [r.quantize(Decimal("0.01"), rounding=ROUND_DOWN) for r in raw]
-    diff = total_stake - sum(rounded)
-    residuals = [(i, raw[i] - rounded[i]) for i in range(len(raw))]
-    residuals.sort(key=lambda t: t[1], reverse=True)
-    cents = int((diff * 100).to_integral_value(rounding=ROUND_HALF_UP))
-    for i in range(cents):
-        idx = residuals[i % len(raw)][0]
-        rounded[idx] += Decimal("0.01")
-    return W, rounded
-
-@bot.command()
-async def allocate(ctx):
+        odds = frac_to_odds(frac)
+        picks.append(Pick(name, frac, odds))
+        odds_list.append(odds)
+    return picks, odds_list
+
+def fmt_cents(cents: int) -> str:
+    """Hundredths as a two-decimal string, e.g. 1234 -> '12.34'."""
+    return f"{cents // 100}.{cents % 100:02d}"
+
+def _round_half_up(x: Fraction) -> int:
+    return math.floor(x + Fraction(1, 2))
+
+def equal_payout_stakes(total_cents: int, odds_list):
+    """Split total_cents so every pick pays out the same; returns (payout, stakes) in cents."""
+    inv = [1 / o for o in odds_list]
+    payout = total_cents / sum(inv)
+    raw = [payout * i for i in inv]
+    stakes = [math.floor(r) for r in raw]
+    # the math is exact, so fewer than len(raw) cents are left over;
+    # hand them out to the largest remainders
+    leftover = total_cents - sum(stakes)
+    for idx in heapq.nlargest(leftover, range(len(raw)), key=lambda i: raw[i] - stakes[i]):
+        stakes[idx] += 1
+    return payout, stakes
+
+@bot.hybrid_command(description="Split a stake so every pick pays out the same")
+@app_commands.describe(slate="Stake then picks, e.g. 1u $10; Scheffler 9/2; McIlroy 8/1")
+async def allocate(ctx, *, slate: str):
     try:
-        lines = ctx.message.content.splitlines()
+        lines = _SLATE_SPLIT_RE.split(slate)
         units, unit_value = parse_header(lines[0])
-        picks = parse_lines(lines[1:])
-        total_stake = (units * unit_value).quantize(Decimal("0.01"))
-        decs = [p[2] for p in picks]
-        W, stakes = equal_payout_stakes(total_stake, decs)
-        units_each = [(s / unit_value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) for s in stakes]
+        picks, odds = parse_lines(lines[1:])
+        total_cents = round(units * unit_value * 100)
+        W, stakes = equal_payout_stakes(total_cents, odds)
+        # stake in units, kept in hundredths: cents / unit_value
+        units_each = [_round_half_up(s / unit_value) for s in stakes]
         table = ["Player | Odds | Units | Dollars", "------ | ---- | ----- | -------"]
-        for (name, frac, _), s, u in zip(picks, stakes, units_each):
-            table.append(f"{name} | {frac} | {u}u | ${s}")
-        await ctx.reply(f"**Equal payout ≈ ${W.quantize(Decimal('0.01'))}**\n```text\n" + "\n".join(table) + "\n```")
+        for p, s, u in zip(picks, stakes, units_each):
+            table.append(f"{p.name} | {p.frac} | {fmt_cents(u)}u | ${fmt_cents(s)}")
+        await ctx.reply(f"**Equal payout ≈ ${fmt_cents(round(W))}**\n```text\n" + "\n".join(table) + "\n```")
     except Exception as e:
         await ctx.reply(f"Error: {e}")
 
 # ---------- New: uptime & health ----------
-@bot.command()
+@bot.hybrid_command(description="Show how long the bot has been running")
 async def uptime(ctx):
     now = datetime.now(timezone.utc)
     delta = (now - START_TIME_UTC).total_seconds()
     start_local = START_TIME_UTC.astimezone(EASTERN)
     await ctx.send(
         f"⏱️ Uptime: **{_fmt_duration(delta)}**\n"
-        f"Started: {start_local.strftime('%a %b %d, %I:%M %p').lstrip('0')} ET"
+        f"Started: {start_local.strftime(_DATE_TIME_FMT)} ET"
     )
 
-@bot.command()
+@bot.hybrid_command(description="Check Discord, Sheets and scheduler status")
 async def health(ctx):
+    await ctx.defer()
     # Discord latency
     latency_ms = int(bot.latency * 1000) if bot.latency is not None else -1
 
     # Reveal channel and perms
     try:
-        ch = bot.get_channel(REVEAL_CHANNEL_ID) or await bot.fetch_channel(REVEAL_CHANNEL_ID)
+        ch = await _reveal_channel(bot)
         guild_ok = ch is not None and hasattr(ch, "guild") and ch.guild is not None
         can_send = ch.permissions_for(ch.guild.me).send_messages if guild_ok else False
         reveal_status = "✅" if guild_ok and can_send else "⚠️" if guild_ok else "❌"
@@ -416,21 +691,17 @@ async def health(ctx):
 
     # Google Sheets
     sheets_ok = False
-    picks_header_ok = False
     sheets_msg = ""
     try:
-        ws = _sheet()
+        # no API call once the worksheet is cached, it was verified when opened
+        if _ws_cache is None:
+            await asyncio.to_thread(_sheet)
         sheets_ok = True
-        try:
-            header = ws.row_values(1)
-            picks_header_ok = (header == _HEADERS)
-        except Exception as e:
-            sheets_msg = f"Header read error: {type(e).__name__}"
     except Exception as e:
         sheets_msg = f"{type(e).__name__}: {e}"
 
     # Scheduler
-    scheduler_running = auto_reveal_task.is_running()
+    scheduler_running = _reveal_task is not None and not _reveal_task.done()
 
     lines = [
         "**🩺 Bot Health Check**",
@@ -439,7 +710,8 @@ async def health(ctx):
             + (" (cannot send)" if ch and not can_send else "")
             + ("" if ch else " (not found)"),
         f"- Sheets connection: {'✅' if sheets_ok else '❌'}",
-        f"- Picks header row: {'✅' if picks_header_ok else '❌'}",
+        f"- Picks header row: "
+            + ("❌" if not sheets_ok else "⚠️ (was rewritten on open)" if _header_rewritten else "✅"),
         f"- Scheduler running: {'✅' if scheduler_running else '❌'}",
     ]
     if sheets_msg:
@@ -448,6 +720,13 @@ async def health(ctx):
     await ctx.send("\n".join(lines))
 
 # ---------- Entrypoint ----------
+def _init_discord_http():
+    # optional alternate Discord API base (e.g. canary to dodge a Cloudflare block), off unless set
+    base = os.getenv("DISCORD_API_BASE")
+    if base:
+        import discord.http
+        discord.http.Route.BASE = base
+
 if __name__ == "__main__":
-    keep_alive()
+    _init_discord_http()
     bot.run(TOKEN)